@@ -4,29 +4,504 @@ BusinessProcessAutomationAI — Multi-Agent System for Process Analysis and Opti
 
 import os
 import re
+import sys
 import json
+import math
+import time
+import hashlib
+import atexit
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import pathlib
 from dotenv import load_dotenv
 
-# Azure AI libraries
-from azure.ai.agents import AgentsClient
-from azure.ai.agents.models import ConnectedAgentTool, MessageRole, ListSortOrder
-from azure.identity import DefaultAzureCredential
+try:
+    import orjson  # Optional: much faster JSON encoding for the saved reports
+except ImportError:
+    orjson = None
+
+# Azure AI and OpenAI SDKs are imported inside the functions that use them: they pull in a
+# large dependency graph, and deferring them lets the CLI show its prompt immediately.
+
+# Credential and client are shared by every call in the process (lazily created, see get_agents_client)
+_CLIENT_LOCK = threading.RLock()
+_CREDENTIAL = None
+_AGENTS_CLIENT = None
+
+# IDs of the persistent agents, reused across runs instead of create + delete every time
+AGENT_IDS_PATH = pathlib.Path("./outputs/.agent_ids.json")
+
+# Report cache: exact and semantic (embedding) lookups of previously generated reports
+CACHE_DIR = pathlib.Path("./outputs/.cache")
+SEMANTIC_SIMILARITY_THRESHOLD = 0.92
+REPORT_CACHE_TTL_SECONDS = 24 * 60 * 60
+
+# Run polling and output limits
+POLL_INTERVAL_SECONDS = 0.5
+RUN_TIMEOUT_SECONDS = 120
+# Longest a streamed run may go without sending any data before it is aborted
+STREAM_READ_TIMEOUT_SECONDS = 30
+# The completion cap only guards against runaway generation. Past reports in ./outputs reach
+# ~600 tokens per analysis and ~750 (about 545 words) per optimizer section, so the cap leaves
+# about 2x headroom; a run that still hits it ends 'incomplete' and is reported as an error.
+MAX_COMPLETION_TOKENS = 1500
+# Deterministic sampling, so identical inputs give identical (and exactly cacheable) reports
+RUN_TEMPERATURE = 0
+
+# Number of process descriptions analysed concurrently in batch mode
+BATCH_MAX_WORKERS = 4
+
+
+# Agent instructions are kept as static module-level constants so every run sends a
+# byte-identical system prefix, which lets the provider serve it from its prompt cache.
+# All request framing lives here too; user messages carry only the per-run content.
+INPUT_FORMAT_INSTRUCTIONS = (
+    "The user message contains only the raw process description. "
+    "If it ends with a line starting with 'Additional instructions:', follow those instructions as well."
+)
+
+ANALYSIS_INSTRUCTIONS = (
+    "You are a Business Process Analysis expert. "
+    "Analyse the provided process description and extract the following four items:\n"
+    "1. Current process steps – list them in order as a numbered list.\n"
+    "2. Bottlenecks or inefficiencies – identify what slows down or disrupts the process.\n"
+    "3. Tools, systems, or resources currently involved – e.g., software, equipment, manual methods.\n"
+    "4. Missing information – what additional details would you need to fully understand the process?\n\n"
+    "Present your findings in exactly four sections with the following headings: "
+    "'Process Steps', 'Bottlenecks', 'Tools Involved', 'Missing Information'. "
+    "If any category has no items, explicitly state 'None identified' under that heading. "
+    "Do not add any extra commentary outside these sections.\n\n"
+    + INPUT_FORMAT_INSTRUCTIONS
+)
+
+OPTIMIZER_INSTRUCTIONS = (
+    "You are a Process Optimization Advisor. "
+    "Based on the process description provided, recommend improvements covering exactly four categories:\n"
+    "1. Automation opportunities – which steps could be automated and with what technology.\n"
+    "2. Elimination of redundant steps – identify steps that add no value and could be removed.\n"
+    "3. Clearer ownership – who should be responsible for each step or area.\n"
+    "4. Feasibility constraints – technical, organisational, or cost limitations to consider.\n\n"
+    "Present your recommendations in exactly four sections with the following headings: "
+    "'Automation Opportunities', 'Elimination of Redundant Steps', "
+    "'Clearer Ownership', 'Feasibility Constraints'. "
+    "If any category has no items, explicitly state 'None identified' under that heading. "
+    "Do not add any extra commentary outside these sections.\n\n"
+    + INPUT_FORMAT_INSTRUCTIONS
+)
+
+
+# Markdown cleanup patterns, compiled once at import time
+_RE_CITATION = re.compile(r'【[^】]*】')
+_RE_BULLETS = re.compile(r"^[\-\*\+\s]+")
+_RE_BOLD = re.compile(r"^\*\*(.+?)\*\*$")
+_RE_ITALIC = re.compile(r"^\*(.+?)\*$")
 
 
 def clean_markdown(s: str) -> str:
     """Remove basic markdown symbols for cleaner display."""
     s = s.strip()
-    s = re.sub(r'【[^】]*】', '', s)  # Remove citations
-    s = re.sub(r"^[\-\*\+\s]+", "", s)  # Remove leading bullets
-    s = re.sub(r"^\*\*(.+?)\*\*$", r"\1", s)  # Remove double asterisks
-    s = re.sub(r"^\*(.+?)\*$", r"\1", s)  # Remove single asterisks
+    s = _RE_CITATION.sub('', s)  # Remove citations
+    s = _RE_BULLETS.sub("", s)  # Remove leading bullets
+    s = _RE_BOLD.sub(r"\1", s)  # Remove double asterisks
+    s = _RE_ITALIC.sub(r"\1", s)  # Remove single asterisks
     return s.strip()
 
 
-def run_process_advisor():
-    os.system("cls" if os.name == "nt" else "clear")
+def dump_report_json(result: dict) -> bytes:
+    """Serialise a report dict as indented UTF-8 JSON, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(result, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(result, ensure_ascii=False, indent=2).encode("utf-8")
+
+
+def write_atomic(path: pathlib.Path, data: bytes) -> None:
+    """Write to a temp file and swap it into place, so readers never see a partial file."""
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, path)
+
+
+def log_run_usage(label: str, run) -> None:
+    """Print token usage for a completed run, including prompt-cache hits when reported."""
+    usage = getattr(run, "usage", None)
+    if not usage:
+        return
+    # Cached prompt tokens are not modelled by the SDK yet, so read them from the raw payload;
+    # "n/a" means the service did not report them, which is not the same as a cache miss
+    details = usage.get("prompt_tokens_details") or {}
+    cached = details.get("cached_tokens", "n/a")
+    print(f"   [{label}] prompt tokens: {usage.prompt_tokens} (cached: {cached}), "
+          f"completion tokens: {usage.completion_tokens}")
+
+
+def load_agent_ids() -> dict:
+    """Load the cached name -> {id, hash} mapping of persistent agents."""
+    if not AGENT_IDS_PATH.exists():
+        return {}
+    with open(AGENT_IDS_PATH, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_agent_ids(agent_ids: dict) -> None:
+    """Persist the name -> {id, hash} mapping of persistent agents."""
+    AGENT_IDS_PATH.parent.mkdir(parents=True, exist_ok=True)
+    with open(AGENT_IDS_PATH, "w", encoding="utf-8") as f:
+        json.dump(agent_ids, f, indent=2)
+
+
+def agent_definition_hash(model: str, instructions: str) -> str:
+    return hashlib.sha256(json.dumps([model, instructions]).encode("utf-8")).hexdigest()
+
+
+def report_definition_hash(model: str) -> str:
+    """Hash everything besides the user input that shapes a report: both agent definitions and run settings."""
+    payload = json.dumps([
+        agent_definition_hash(model, ANALYSIS_INSTRUCTIONS),
+        agent_definition_hash(model, OPTIMIZER_INSTRUCTIONS),
+        MAX_COMPLETION_TOKENS,
+        RUN_TEMPERATURE,
+    ])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def get_or_create_agent(agents_client, name: str, model: str, instructions: str):
+    """Reuse the persisted agent with this name, creating it only if missing or its definition changed."""
+    from azure.core.exceptions import ResourceNotFoundError
+
+    definition_hash = agent_definition_hash(model, instructions)
+    agent_ids = load_agent_ids()
+    cached = agent_ids.get(name)
+
+    if cached and cached["hash"] == definition_hash:
+        try:
+            return agents_client.get_agent(cached["id"])
+        except ResourceNotFoundError:
+            pass  # Deleted outside this tool; fall through and recreate it
+    elif cached:
+        # Model or instructions changed, so the stale agent is replaced
+        try:
+            agents_client.delete_agent(cached["id"])
+        except ResourceNotFoundError:
+            pass
+
+    agent = agents_client.create_agent(
+        model=model,
+        name=name,
+        instructions=instructions
+    )
+    agent_ids[name] = {"id": agent.id, "hash": definition_hash}
+    save_agent_ids(agent_ids)
+    return agent
+
+
+def run_agent(agents_client, agent_id: str, content: str, label: str = "agent",
+              max_completion_tokens: int = MAX_COMPLETION_TOKENS, cancel_event: threading.Event = None):
+    """Run a single agent on its own thread; returns (final response, finished run).
+
+    Usage is not logged here because this may run on a worker thread; callers log it.
+    Setting cancel_event cancels the run at the next poll.
+    """
+    from azure.ai.agents.models import ListSortOrder, MessageRole
+
+    thread = agents_client.threads.create()
+    agents_client.messages.create(
+        thread_id=thread.id,
+        role=MessageRole.USER,
+        content=content
+    )
+
+    run = agents_client.runs.create(
+        thread_id=thread.id,
+        agent_id=agent_id,
+        max_completion_tokens=max_completion_tokens,
+        temperature=RUN_TEMPERATURE
+    )
+
+    # Poll explicitly with a wall-clock cap instead of create_and_process, which can block forever
+    deadline = time.monotonic() + RUN_TIMEOUT_SECONDS
+    while run.status in ("queued", "in_progress"):
+        if cancel_event is not None and cancel_event.is_set():
+            agents_client.runs.cancel(thread_id=thread.id, run_id=run.id)
+            raise RuntimeError(f"Run cancelled ({label}): {run.id}")
+        if time.monotonic() > deadline:
+            agents_client.runs.cancel(thread_id=thread.id, run_id=run.id)
+            raise RuntimeError(f"Run timed out after {RUN_TIMEOUT_SECONDS}s: {run.id}")
+        time.sleep(POLL_INTERVAL_SECONDS)
+        run = agents_client.runs.get(thread_id=thread.id, run_id=run.id)
+
+    if run.status in ("failed", "cancelled", "expired"):
+        # status is a RunStatus enum, whose str() would read "RunStatus.FAILED"
+        raise RuntimeError(f"Run {run.status.value}: {run.last_error}")
+    if run.status == "incomplete":
+        # Hit max_completion_tokens: the answer is cut off, so it must not be saved or cached
+        raise RuntimeError(f"Run incomplete ({label}): {run.incomplete_details}")
+
+    # Only fetch messages produced by this run, newest first, and stop at the final answer
+    messages = agents_client.messages.list(
+        thread_id=thread.id,
+        run_id=run.id,
+        order=ListSortOrder.DESCENDING
+    )
+    for m in messages:
+        if m.role == "assistant" and m.text_messages:
+            return m.text_messages[-1].text.value, run
+    return "", run
+
+
+def cosine_similarity(a: list, b: list) -> float:
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norm if norm else 0.0
+
+
+class ReportCache:
+    """Cache of previous reports, matched exactly by input hash or semantically by embedding.
+
+    Exact hits are stored as one JSON file per sha256(agent definitions, description, instructions)
+    key and need no network calls. Semantic hits use a small JSON index of (embedding, report path)
+    entries pointing at the reports already written to ./outputs, and are skipped when no
+    embedding function is configured.
+    """
+
+    def __init__(self, model: str, embed=None, cache_dir: pathlib.Path = CACHE_DIR,
+                 threshold: float = SEMANTIC_SIMILARITY_THRESHOLD,
+                 ttl: float = REPORT_CACHE_TTL_SECONDS, enabled: bool = True):
+        self.model = model
+        # Changing the agents' instructions or run settings invalidates every cached report
+        self.definition_hash = report_definition_hash(model)
+        self.embed = embed
+        self.cache_dir = cache_dir
+        self.index_path = cache_dir / "semantic_index.json"
+        self.threshold = threshold
+        self.ttl = ttl
+        self.enabled = enabled
+        # Embeddings computed on a miss, kept until put() so the description is only embedded once
+        self._pending_embeddings = {}
+        self._lock = threading.Lock()
+
+    def exact_key(self, process_description: str, custom_commands: str) -> str:
+        payload = json.dumps(
+            {"model": self.model, "agents": self.definition_hash,
+             "desc": process_description, "cmds": custom_commands},
+            sort_keys=True
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _is_fresh(self, created: float) -> bool:
+        return self.ttl is None or time.time() - created <= self.ttl
+
+    @staticmethod
+    def _read_json(path: pathlib.Path):
+        """Load a cache file, treating a missing or corrupt file as a miss."""
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _load_index(self) -> list:
+        return self._read_json(self.index_path) or []
+
+    def _is_live(self, entry: dict) -> bool:
+        return self._is_fresh(entry["created"]) and pathlib.Path(entry["report_path"]).exists()
+
+    def _embed(self, process_description: str):
+        """Embed the description, or return None if the embedding service fails (the cache fails open)."""
+        try:
+            return self.embed(process_description)
+        except Exception as e:
+            print(f"Warning: report cache embedding failed, skipping semantic lookup: {e}")
+            return None
+
+    def _get_exact(self, process_description: str, custom_commands: str):
+        path = self.cache_dir / f"{self.exact_key(process_description, custom_commands)}.json"
+        if not path.exists() or not self._is_fresh(path.stat().st_mtime):
+            return None
+        return self._read_json(path)
+
+    def _get_semantic(self, process_description: str, custom_commands: str):
+        with self._lock:
+            index = self._load_index()
+        entries = [
+            e for e in index
+            if e.get("definition") == self.definition_hash and e["custom_commands"] == custom_commands
+            and self._is_live(e)
+        ]
+
+        embedding = self._embed(process_description)
+        if embedding is None:
+            return None
+        match, best_score = None, 0.0
+        for entry in entries:
+            score = cosine_similarity(embedding, entry["embedding"])
+            if score >= self.threshold and score > best_score:
+                match, best_score = entry, score
+
+        if match is None:
+            # A miss is followed by put(), which reuses this embedding
+            self._pending_embeddings[process_description] = embedding
+            return None
+        return self._read_json(pathlib.Path(match["report_path"]))
+
+    def get(self, process_description: str, custom_commands: str):
+        """Return the cached report dict for these inputs, or None on a miss."""
+        if not self.enabled:
+            return None
+
+        # Exact match first: zero network traffic on deterministic repeats
+        result = self._get_exact(process_description, custom_commands)
+        if result is None and self.embed is not None:
+            result = self._get_semantic(process_description, custom_commands)
+        return result
+
+    def put(self, process_description: str, custom_commands: str, result: dict,
+            report_path: pathlib.Path) -> None:
+        """Store a freshly generated report so later identical or similar inputs can reuse it."""
+        if not self.enabled:
+            return
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        exact_path = self.cache_dir / f"{self.exact_key(process_description, custom_commands)}.json"
+        write_atomic(exact_path, dump_report_json(result))
+
+        if self.embed is None:
+            return
+        embedding = self._pending_embeddings.pop(process_description, None) or self._embed(process_description)
+        if embedding is None:
+            return  # The exact entry is stored; only semantic indexing is skipped
+        with self._lock:
+            # Expired entries and entries whose report was deleted are dropped on every rewrite
+            entries = [e for e in self._load_index() if self._is_live(e)]
+            entries.append({
+                "model": self.model,
+                "definition": self.definition_hash,
+                "embedding": embedding,
+                "custom_commands": custom_commands,
+                "report_path": str(report_path),
+                "created": time.time()
+            })
+            write_atomic(self.index_path, json.dumps(entries).encode("utf-8"))
+
+
+def create_embedder(credential):
+    """Return an embedding function for the configured Azure OpenAI deployment, or None if not configured.
+
+    The OpenAI client is only built on the first call, so an exact cache hit never waits for it.
+    """
+    endpoint = os.getenv('AZURE_OPENAI_ENDPOINT')
+    deployment = os.getenv('EMBEDDING_DEPLOYMENT_NAME')
+    if not endpoint or not deployment:
+        return None
+
+    client = None
+    client_lock = threading.Lock()
+
+    def get_client():
+        nonlocal client
+        with client_lock:
+            if client is None:
+                from azure.identity import get_bearer_token_provider
+                from openai import AzureOpenAI
+
+                client = AzureOpenAI(
+                    azure_endpoint=endpoint,
+                    api_version=os.getenv('AZURE_OPENAI_API_VERSION', "2024-10-21"),
+                    azure_ad_token_provider=get_bearer_token_provider(
+                        credential, "https://cognitiveservices.azure.com/.default"
+                    ),
+                )
+            return client
+
+    def embed(text: str) -> list:
+        return get_client().embeddings.create(model=deployment, input=text).data[0].embedding
+
+    return embed
+
+
+def stream_agent(agents_client, agent_id: str, content: str, label: str = "agent",
+                 max_completion_tokens: int = MAX_COMPLETION_TOKENS):
+    """Run a single agent on its own thread, printing its response as it streams in.
+
+    Returns (full response, finished run), like run_agent.
+    """
+    from azure.ai.agents.models import AgentStreamEvent, MessageDeltaChunk, MessageRole, ThreadRun
+    from azure.core.exceptions import AzureError
+
+    thread = agents_client.threads.create()
+    agents_client.messages.create(
+        thread_id=thread.id,
+        role=MessageRole.USER,
+        content=content
+    )
+
+    chunks = []
+    run_id = None
+    finished_run = None
+    # Same wall-clock cap as the polling path, checked as each event arrives; a stream that
+    # stalls without sending events is bounded separately by the HTTP read timeout below
+    deadline = time.monotonic() + RUN_TIMEOUT_SECONDS
+
+    def abort(reason: str):
+        print()
+        if run_id is not None:
+            try:
+                agents_client.runs.cancel(thread_id=thread.id, run_id=run_id)
+            except AzureError:
+                pass  # The run may already have reached a terminal state
+        return RuntimeError(reason)
+
+    try:
+        with agents_client.runs.stream(
+            thread_id=thread.id,
+            agent_id=agent_id,
+            max_completion_tokens=max_completion_tokens,
+            temperature=RUN_TEMPERATURE,
+            read_timeout=STREAM_READ_TIMEOUT_SECONDS
+        ) as stream:
+            for event_type, event_data, _ in stream:
+                if isinstance(event_data, ThreadRun):
+                    run_id = event_data.id
+                if time.monotonic() > deadline:
+                    raise abort(f"Run timed out after {RUN_TIMEOUT_SECONDS}s: {run_id}")
+
+                if isinstance(event_data, MessageDeltaChunk):
+                    print(event_data.text, end="", flush=True)
+                    chunks.append(event_data.text)
+                elif isinstance(event_data, ThreadRun) and event_data.status in ("failed", "cancelled", "expired"):
+                    raise RuntimeError(f"Run {event_data.status.value}: {event_data.last_error}")
+                elif isinstance(event_data, ThreadRun) and event_data.status == "incomplete":
+                    print()
+                    raise RuntimeError(f"Run incomplete ({label}): {event_data.incomplete_details}")
+                elif isinstance(event_data, ThreadRun) and event_data.status == "completed":
+                    print()
+                    finished_run = event_data
+                elif event_type == AgentStreamEvent.ERROR:
+                    raise RuntimeError(f"Run failed: {event_data}")
+    except AzureError as e:
+        # Includes the read timeout firing on a stalled stream
+        raise abort(f"Run stream interrupted ({label}): {e}") from e
+
+    if finished_run is None:
+        # Without a terminal event the collected text may be partial, so it must not be saved or cached
+        raise abort(f"Run stream ended before the run finished ({label}): {run_id}")
+
+    return "".join(chunks), finished_run
+
+
+def get_credential():
+    """Return the process-wide DefaultAzureCredential, creating it on first use."""
+    global _CREDENTIAL
+    with _CLIENT_LOCK:
+        if _CREDENTIAL is None:
+            from azure.identity import DefaultAzureCredential
+            _CREDENTIAL = DefaultAzureCredential()
+        return _CREDENTIAL
+
+
+def load_settings():
+    """Return (PROJECT_ENDPOINT, MODEL_DEPLOYMENT) from the .env file."""
     load_dotenv()
 
     PROJECT_ENDPOINT = os.getenv('PROJECT_ENDPOINT')
@@ -34,192 +509,333 @@ def run_process_advisor():
 
     if not PROJECT_ENDPOINT or not MODEL_DEPLOYMENT:
         raise RuntimeError("Set PROJECT_ENDPOINT and MODEL_DEPLOYMENT_NAME in your .env file.")
+    return PROJECT_ENDPOINT, MODEL_DEPLOYMENT
 
-    credential = DefaultAzureCredential()
-    agents_client = AgentsClient(
-        endpoint=PROJECT_ENDPOINT,
-        credential=credential,
-    )
 
-    try:
-        with agents_client:
-            # --------------------- User Input ---------------------
-            print("\n📋 --- Business Process Automation Advisor --- 📋\n")
-            print("Describe the business process you want to analyse (multi-line, empty line to finish):")
-            process_lines = []
-            while True:
-                line = input()
-                if line == "":
-                    break
-                process_lines.append(line)
-            process_description = "\n".join(process_lines)
-
-            if not process_description.strip():
-                print("No process description provided. Exiting.")
-                return
-
-            custom_commands = input("\nEnter any additional instructions or 'none': ").strip() or "none"
-            print("\n🔍 Analysing process...\n")
-
-            # --------------------- Create Agents ---------------------
-            # Agent 1: Process Analysis
-            analysis_agent = agents_client.create_agent(
-                model=MODEL_DEPLOYMENT,
-                name="process_analysis_agent",
-                instructions=(
-                    "You are a Business Process Analysis expert. "
-                    "Analyse the provided process description and extract the following four items:\n"
-                    "1. Current process steps – list them in order as a numbered list.\n"
-                    "2. Bottlenecks or inefficiencies – identify what slows down or disrupts the process.\n"
-                    "3. Tools, systems, or resources currently involved – e.g., software, equipment, manual methods.\n"
-                    "4. Missing information – what additional details would you need to fully understand the process?\n\n"
-                    "Present your findings in exactly four sections with the following headings: "
-                    "'Process Steps', 'Bottlenecks', 'Tools Involved', 'Missing Information'. "
-                    "If any category has no items, explicitly state 'None identified' under that heading. "
-                    "Do not add any extra commentary outside these sections."
-                )
-            )
+def preload_sdk() -> None:
+    """Import the Azure SDK modules in the background while the user is typing."""
+    def load():
+        import azure.ai.agents  # noqa: F401
+        import azure.identity  # noqa: F401
+        try:
+            import openai  # noqa: F401
+        except ImportError:
+            pass  # Semantic caching is optional
 
-            # Agent 2: Process Optimization Advisor
-            optimizer_agent = agents_client.create_agent(
-                model=MODEL_DEPLOYMENT,
-                name="process_optimization_advisor",
-                instructions=(
-                    "You are a Process Optimization Advisor. "
-                    "Based on the analysis provided, recommend improvements covering exactly four categories:\n"
-                    "1. Automation opportunities – which steps could be automated and with what technology.\n"
-                    "2. Elimination of redundant steps – identify steps that add no value and could be removed.\n"
-                    "3. Clearer ownership – who should be responsible for each step or area.\n"
-                    "4. Feasibility constraints – technical, organisational, or cost limitations to consider.\n\n"
-                    "Present your recommendations in exactly four sections with the following headings: "
-                    "'Automation Opportunities', 'Elimination of Redundant Steps', "
-                    "'Clearer Ownership', 'Feasibility Constraints'. "
-                    "If any category has no items, explicitly state 'None identified' under that heading. "
-                    "Do not add any extra commentary outside these sections."
-                )
-            )
+    threading.Thread(target=load, daemon=True).start()
 
-            # Orchestrator Agent
-            t_analysis = ConnectedAgentTool(
-                id=analysis_agent.id,
-                name="process_analysis_agent",
-                description="Analyses a business process and extracts steps, bottlenecks, tools, missing info."
-            )
-            t_optimizer = ConnectedAgentTool(
-                id=optimizer_agent.id,
-                name="process_optimization_advisor",
-                description="Provides automation recommendations based on process analysis."
-            )
 
-            orchestrator = agents_client.create_agent(
-                model=MODEL_DEPLOYMENT,
-                name="process_orchestrator",
-                instructions=(
-                    "You are a Process Automation Orchestrator. "
-                    "The user has already provided a process description. "
-                    "Your job is to:\n"
-                    "1. Call the 'process_analysis_agent' to analyse the process. It will return four sections: "
-                    "'Process Steps', 'Bottlenecks', 'Tools Involved', 'Missing Information'.\n"
-                    "2. Take that analysis and give it to the 'process_optimization_advisor' to generate recommendations. "
-                    "It will return four sections: 'Automation Opportunities', 'Elimination of Redundant Steps', "
-                    "'Clearer Ownership', 'Feasibility Constraints'.\n"
-                    "3. Present the final output with two main sections: "
-                    "'PROCESS ANALYSIS' and 'OPTIMIZATION RECOMMENDATIONS'. "
-                    "Under 'PROCESS ANALYSIS', include the four sub-sections from the analysis agent exactly as provided. "
-                    "Under 'OPTIMIZATION RECOMMENDATIONS', include the four sub-sections from the optimization advisor exactly as provided. "
-                    "Do not add any additional commentary or merge sections. "
-                    "If any of the required eight sub-sections are missing, you must explicitly note the deficiency and ask the user to rerun."
-                ),
-                tools=[t_analysis.definitions[0], t_optimizer.definitions[0]]
+def get_agents_client():
+    """Return the process-wide AgentsClient and the model deployment name from the .env settings."""
+    global _AGENTS_CLIENT
+    PROJECT_ENDPOINT, MODEL_DEPLOYMENT = load_settings()
+
+    with _CLIENT_LOCK:
+        if _AGENTS_CLIENT is None:
+            from azure.ai.agents import AgentsClient
+            _AGENTS_CLIENT = AgentsClient(
+                endpoint=PROJECT_ENDPOINT,
+                credential=get_credential(),
             )
+            atexit.register(_AGENTS_CLIENT.close)
+        return _AGENTS_CLIENT, MODEL_DEPLOYMENT
 
-            # --------------------- Run Orchestration ---------------------
-            thread = agents_client.threads.create()
 
-            user_message = f"Process description:\n{process_description}\n"
-            if custom_commands != "none":
-                user_message += f"\nAdditional instructions: {custom_commands}\n"
-            user_message += "\nPlease analyse and optimise this process."
+def get_agents(agents_client, model: str):
+    """Return the (analysis, optimizer) agents, reusing persisted ones where possible."""
+    # Agents persist between runs; they are only recreated when their definition changes
+    # Agent 1: Process Analysis
+    analysis_agent = get_or_create_agent(
+        agents_client,
+        name="process_analysis_agent",
+        model=model,
+        instructions=ANALYSIS_INSTRUCTIONS
+    )
 
-            agents_client.messages.create(
-                thread_id=thread.id,
-                role=MessageRole.USER,
-                content=user_message
-            )
+    # Agent 2: Process Optimization Advisor (drafts recommendations from the raw description)
+    optimizer_agent = get_or_create_agent(
+        agents_client,
+        name="process_optimization_advisor",
+        model=model,
+        instructions=OPTIMIZER_INSTRUCTIONS
+    )
+    return analysis_agent, optimizer_agent
+
+
+def analyse_process(agents_client, agents, process_description: str, custom_commands: str,
+                    stream: bool = False) -> str:
+    """Run the analysis and optimization agents concurrently and assemble the full report.
 
-            run = agents_client.runs.create_and_process(
-                thread_id=thread.id,
-                agent_id=orchestrator.id
+    With stream=True the analysis is printed as it is generated, followed by the recommendations.
+    """
+    analysis_agent, optimizer_agent = agents
+
+    # Only the variable content is sent; the framing is part of the cached agent instructions
+    user_message = process_description
+    if custom_commands != "none":
+        user_message += f"\n\nAdditional instructions: {custom_commands}"
+
+    # Both agents only depend on the description: the optimizer runs in the background
+    # while the analysis runs (and optionally streams) on this thread
+    cancel_optimizer = threading.Event()
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        optimizer_future = executor.submit(
+            run_agent, agents_client, optimizer_agent.id,
+            user_message, "optimizer",
+            cancel_event=cancel_optimizer
+        )
+        if stream:
+            print("## PROCESS ANALYSIS\n")
+        try:
+            analysis_text, analysis_run = (stream_agent if stream else run_agent)(
+                agents_client, analysis_agent.id,
+                user_message, "analysis"
             )
+        except BaseException:
+            # The report is lost anyway: stop the optimizer run (and its billing) instead of
+            # waiting up to RUN_TIMEOUT_SECONDS for it before the error reaches the user
+            cancel_optimizer.set()
+            raise
+        optimizer_text, optimizer_run = optimizer_future.result()
+        if stream:
+            print(f"\n## OPTIMIZATION RECOMMENDATIONS\n\n{optimizer_text}\n")
+
+    # Logged only now so usage lines never land inside the streamed output
+    log_run_usage("analysis", analysis_run)
+    log_run_usage("optimizer", optimizer_run)
+
+    return f"## PROCESS ANALYSIS\n\n{analysis_text}\n\n## OPTIMIZATION RECOMMENDATIONS\n\n{optimizer_text}"
+
 
-            if run.status == "failed":
-                print("Run failed:", run.last_error)
-                return
+def save_report(process_description: str, custom_commands: str, full_report: str, suffix: str = ""):
+    """Save the report as Markdown and JSON under ./outputs; returns (result, md_path, json_path)."""
+    now = datetime.now()
+    ts = now.strftime("%Y%m%d-%H%M%S")
+    out_dir = pathlib.Path("./outputs")
+    out_dir.mkdir(parents=True, exist_ok=True)
 
-            # --------------------- Retrieve and Display Results ---------------------
-            messages = agents_client.messages.list(
-                thread_id=thread.id,
-                order=ListSortOrder.ASCENDING
+    md_path = out_dir / f"process_report_{ts}{suffix}.md"
+    json_path = out_dir / f"process_report_{ts}{suffix}.json"
+    result = {
+        "timestamp": now.isoformat(),
+        "process_description": process_description,
+        "custom_commands": custom_commands,
+        "full_report": full_report
+    }
+
+    # Build each file in memory so it is written with a single call
+    md_sections = [
+        "# Business Process Automation Report\n\n",
+        f"**Date:** {now.strftime('%Y-%m-%d %H:%M:%S')}\n\n",
+        "## Original Process Description\n",
+        f"```\n{process_description}\n```\n\n",
+    ]
+    if custom_commands != "none":
+        md_sections.append(f"**Additional Instructions:** {custom_commands}\n\n")
+    md_sections += ["## Full Report\n\n", full_report]
+    md = "".join(md_sections)
+
+    # Also save as JSON with metadata
+    json_bytes = dump_report_json(result)
+
+    # The two files are independent, so write them concurrently
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        futures = [
+            executor.submit(md_path.write_text, md, encoding="utf-8"),
+            executor.submit(json_path.write_bytes, json_bytes),
+        ]
+        for future in futures:
+            future.result()
+
+    return result, md_path, json_path
+
+
+def run_process_advisor(custom_commands: str = "none"):
+    """Analyse one process description read from the console or from piped stdin.
+
+    custom_commands is only used for piped input; interactive sessions prompt for it.
+    """
+    os.system("cls" if os.name == "nt" else "clear")
+    load_settings()  # Fail on missing configuration before asking for input
+    preload_sdk()
+
+    # --------------------- User Input ---------------------
+    print("\n📋 --- Business Process Automation Advisor --- 📋\n")
+    piped = not sys.stdin.isatty()
+    if piped:
+        # Piped input (e.g. `cat process.txt | python main.py`): read it in one go
+        process_description = sys.stdin.read().strip()
+    else:
+        print("Describe the business process you want to analyse (multi-line, empty line to finish):")
+        process_lines = []
+        while True:
+            line = input()
+            if line == "":
+                break
+            process_lines.append(line)
+        process_description = "\n".join(process_lines)
+
+    if not process_description.strip():
+        print("No process description provided. Exiting.")
+        return
+
+    if not piped:
+        custom_commands = input("\nEnter any additional instructions or 'none': ").strip() or "none"
+
+    # The SDK import has been overlapping with input collection; the client is cheap to build now
+    agents_client, MODEL_DEPLOYMENT = get_agents_client()
+    report_cache = ReportCache(MODEL_DEPLOYMENT, embed=create_embedder(get_credential()))
+
+    # --------------------- Check Report Cache ---------------------
+    cached_result = report_cache.get(process_description, custom_commands)
+    if cached_result is not None:
+        print("\n♻️  Found a previous report for this process:\n")
+        print(cached_result["full_report"])
+        return
+
+    print("\n🔍 Analysing process...\n")
+
+    # --------------------- Run Agents ---------------------
+    try:
+        agents = get_agents(agents_client, MODEL_DEPLOYMENT)
+        # The report is displayed while it streams in
+        full_report = analyse_process(
+            agents_client, agents, process_description, custom_commands, stream=True
+        )
+    except RuntimeError as e:
+        print(e)
+        return
+
+    # --------------------- Save Output ---------------------
+    result, md_path, json_path = save_report(process_description, custom_commands, full_report)
+
+    print(f"\n📁 Reports saved:")
+    print(f"  Markdown: {md_path.resolve()}")
+    print(f"  JSON: {json_path.resolve()}")
+
+    report_cache.put(process_description, custom_commands, result, json_path)
+
+
+def load_batch_file(path: str) -> list:
+    """Read process descriptions from a JSONL file.
+
+    Each line is either a JSON string or an object with a "process_description" key.
+    """
+    descriptions = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            descriptions.append(item if isinstance(item, str) else item["process_description"])
+    return descriptions
+
+
+def run_process_advisor_batch(descriptions: list, custom_commands: str = "none",
+                              max_workers: int = BATCH_MAX_WORKERS):
+    """Analyse many process descriptions with one set of agents, several at a time."""
+    agents_client, MODEL_DEPLOYMENT = get_agents_client()
+    report_cache = ReportCache(MODEL_DEPLOYMENT, embed=create_embedder(get_credential()))
+
+    # Agents are resolved once, on the first cache miss, and shared by every item in the batch
+    agents_lock = threading.Lock()
+    resolved_agents = []
+
+    def get_batch_agents():
+        with agents_lock:
+            if not resolved_agents:
+                resolved_agents.append(get_agents(agents_client, MODEL_DEPLOYMENT))
+            return resolved_agents[0]
+
+    def process_one(index: int, process_description: str) -> str:
+        cached_result = report_cache.get(process_description, custom_commands)
+        if cached_result is not None:
+            # Every item still gets its own report files, even when the content comes from the cache
+            _, _, json_path = save_report(
+                process_description, custom_commands, cached_result["full_report"], suffix=f"_{index:03d}"
             )
+            return f"[{index}] ♻️  {json_path.resolve()} (from cache)"
 
-            # Collect assistant's final response(s)
-            assistant_texts = []
-            for m in messages:
-                if m.role == "assistant" and m.text_messages:
-                    text = m.text_messages[-1].text.value
-                    assistant_texts.append(text)
-                    print(text)  # immediate display
-
-            full_report = "\n".join(assistant_texts)
-
-            # --------------------- Save Output ---------------------
-            ts = datetime.now().strftime("%Y%m%d-%H%M%S")
-            out_dir = pathlib.Path("./outputs")
-            out_dir.mkdir(parents=True, exist_ok=True)
-
-            # Save raw report as Markdown
-            md_path = out_dir / f"process_report_{ts}.md"
-            with open(md_path, "w", encoding="utf-8") as f:
-                f.write(f"# Business Process Automation Report\n\n")
-                f.write(f"**Date:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
-                f.write(f"## Original Process Description\n")
-                f.write(f"```\n{process_description}\n```\n\n")
-                if custom_commands != "none":
-                    f.write(f"**Additional Instructions:** {custom_commands}\n\n")
-                f.write(f"## Full Report\n\n")
-                f.write(full_report)
-
-            # Also save as JSON with metadata
-            result = {
-                "timestamp": datetime.now().isoformat(),
-                "process_description": process_description,
-                "custom_commands": custom_commands,
-                "full_report": full_report
-            }
-            json_path = out_dir / f"process_report_{ts}.json"
-            with open(json_path, "w", encoding="utf-8") as f:
-                json.dump(result, f, ensure_ascii=False, indent=2)
-
-            print(f"\n📁 Reports saved:")
-            print(f"  Markdown: {md_path.resolve()}")
-            print(f"  JSON: {json_path.resolve()}")
-
-    finally:
-        # Clean up agents
-        print("\nCleaning up agents...")
-        agents_to_clean = [
-            locals().get("orchestrator"),
-            locals().get("analysis_agent"),
-            locals().get("optimizer_agent")
+        agents = get_batch_agents()
+        full_report = analyse_process(agents_client, agents, process_description, custom_commands)
+        result, _, json_path = save_report(
+            process_description, custom_commands, full_report, suffix=f"_{index:03d}"
+        )
+        report_cache.put(process_description, custom_commands, result, json_path)
+        return f"[{index}] 📁 {json_path.resolve()}"
+
+    print(f"\n🔍 Analysing {len(descriptions)} processes...\n")
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            (index, executor.submit(process_one, index, description))
+            for index, description in enumerate(descriptions, start=1)
+            if description.strip()
         ]
-        for agent in agents_to_clean:
-            if agent is not None:
-                try:
-                    agents_client.delete_agent(agent.id)
-                except Exception as e:
-                    print(f"Warning: could not delete agent {agent.id}: {e}")
-        print("✅ Done.")
+        for index, future in futures:
+            # One failing item (e.g. a throttled HTTP call) must not abort the rest of the batch
+            try:
+                print(future.result())
+            except Exception as e:
+                print(f"[{index}] ❌ {e}")
+
+
+def cleanup_agents():
+    """Delete all persisted agents created by previous runs."""
+    agent_ids = load_agent_ids()
+    if not agent_ids:
+        print("No persisted agents to clean up.")
+        return
+
+    from azure.core.exceptions import ResourceNotFoundError
+
+    agents_client, _ = get_agents_client()
+
+    def delete_agent(name: str, cached: dict) -> bool:
+        """Delete one agent; returns False if it still exists afterwards."""
+        try:
+            agents_client.delete_agent(cached["id"])
+        except ResourceNotFoundError:
+            pass  # Already gone
+        except Exception as e:
+            print(f"Warning: could not delete agent {name} ({cached['id']}): {e}")
+            return False
+        return True
+
+    print("\nCleaning up agents...")
+    # Deletes are independent round-trips, so issue them concurrently
+    with ThreadPoolExecutor(max_workers=len(agent_ids)) as executor:
+        deleted = list(executor.map(delete_agent, agent_ids.keys(), agent_ids.values()))
+
+    # Keep the IDs of agents that could not be deleted so a later cleanup can retry them
+    failed = {name: cached for (name, cached), ok in zip(agent_ids.items(), deleted) if not ok}
+    if failed:
+        save_agent_ids(failed)
+        print(f"⚠️  {len(failed)} agent(s) could not be deleted; rerun cleanup to retry.")
+        return
+    AGENT_IDS_PATH.unlink()
+    print("✅ Done.")
 
 
 if __name__ == "__main__":
-    run_process_advisor()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Business Process Automation Advisor")
+    parser.add_argument(
+        "command", nargs="?", choices=["run", "batch", "cleanup"], default="run",
+        help="'run' analyses a process interactively (default); 'batch' analyses every description "
+             "in a JSONL file; 'cleanup' deletes the persisted agents"
+    )
+    parser.add_argument("batch_file", nargs="?", help="JSONL file of process descriptions (batch mode)")
+    parser.add_argument(
+        "--instructions", default="none",
+        help="Additional instructions applied in batch mode or to a description piped on stdin"
+    )
+    args = parser.parse_args()
+
+    if args.command == "cleanup":
+        cleanup_agents()
+    elif args.command == "batch":
+        if not args.batch_file:
+            parser.error("batch mode requires a JSONL file")
+        run_process_advisor_batch(load_batch_file(args.batch_file), custom_commands=args.instructions)
+    else:
+        run_process_advisor(custom_commands=args.instructions)
\ No newline at end of file
@@ -0,0 +1,32 @@
+import json
+import pathlib
+import sys
+
+# main.py lives at the repository root and is not an installed package
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent))
+
+import pytest
+
+import main
+
+
+@pytest.fixture
+def agent_ids_path(tmp_path, monkeypatch):
+    path = tmp_path / ".agent_ids.json"
+    monkeypatch.setattr(main, "AGENT_IDS_PATH", path)
+    return path
+
+
+@pytest.fixture
+def cache_dir(tmp_path):
+    return tmp_path / "cache"
+
+
+@pytest.fixture
+def saved_report(tmp_path):
+    """Write a report JSON file like save_report does and return its path."""
+    def save(name, full_report):
+        path = tmp_path / f"{name}.json"
+        path.write_text(json.dumps({"full_report": full_report}), encoding="utf-8")
+        return path
+    return save
@@ -0,0 +1,100 @@
+"""In-memory stand-ins for the Azure services used by main.py."""
+
+import contextlib
+from types import SimpleNamespace
+
+from azure.ai.agents.models import ThreadRun
+from azure.core.exceptions import ResourceNotFoundError
+
+
+class FakeEmbedder:
+    """Maps descriptions to fixed vectors and counts calls."""
+
+    def __init__(self, vectors, fail=False):
+        self.vectors = vectors
+        self.fail = fail
+        self.calls = 0
+
+    def __call__(self, text):
+        self.calls += 1
+        if self.fail:
+            raise ConnectionError("embedding service down")
+        return self.vectors[text]
+
+
+class FakeAgentsClient:
+    def __init__(self, missing=(), failing_deletes=()):
+        self.missing = set(missing)
+        self.failing_deletes = set(failing_deletes)
+        self.created = []
+        self.deleted = []
+        self._next_id = 0
+
+    def create_agent(self, model, name, instructions):
+        self._next_id += 1
+        agent = SimpleNamespace(id=f"agent-{self._next_id}", name=name)
+        self.created.append(agent)
+        return agent
+
+    def get_agent(self, agent_id):
+        if agent_id in self.missing:
+            raise ResourceNotFoundError("gone")
+        return SimpleNamespace(id=agent_id)
+
+    def delete_agent(self, agent_id):
+        if agent_id in self.failing_deletes:
+            raise RuntimeError("service unavailable")
+        self.deleted.append(agent_id)
+
+
+class FakeRunClient:
+    """Agents client whose polled runs step through scripted statuses (the last one repeats).
+
+    Streamed runs yield the scripted (event type, data) pairs in `events`; an exception in the
+    list is raised when the stream reaches it.
+    """
+
+    def __init__(self, statuses=("completed",), reply="answer", events=()):
+        self.statuses = list(statuses)
+        self.reply = reply
+        self.events = list(events)
+        self.run_kwargs = None
+        self.cancelled = []
+        self.threads = SimpleNamespace(create=lambda: SimpleNamespace(id="thread-1"))
+        self.messages = SimpleNamespace(create=lambda **kwargs: None, list=self._list_messages)
+        self.runs = SimpleNamespace(
+            create=self._create_run, get=self._get_run, cancel=self._cancel_run, stream=self._stream_run
+        )
+
+    def _next_run(self):
+        status = self.statuses.pop(0) if len(self.statuses) > 1 else self.statuses[0]
+        return ThreadRun({"id": "run-1", "status": status, "incomplete_details": {"reason": "max_completion_tokens"}})
+
+    def _create_run(self, **kwargs):
+        self.run_kwargs = kwargs
+        return self._next_run()
+
+    def _get_run(self, thread_id, run_id):
+        return self._next_run()
+
+    @contextlib.contextmanager
+    def _stream_run(self, **kwargs):
+        self.run_kwargs = kwargs
+
+        def events():
+            for event in self.events:
+                if isinstance(event, Exception):
+                    raise event
+                event_type, data = event
+                yield event_type, data, None
+        yield events()
+
+    def _cancel_run(self, thread_id, run_id):
+        self.cancelled.append(run_id)
+
+    def _list_messages(self, **kwargs):
+        # Newest first, as requested by run_agent
+        return [
+            SimpleNamespace(role="assistant", text_messages=[SimpleNamespace(text=SimpleNamespace(value=self.reply))]),
+            SimpleNamespace(role="user", text_messages=[SimpleNamespace(text=SimpleNamespace(value="question"))]),
+        ]
@@ -0,0 +1,45 @@
+"""Offline checks for reusing, recreating and cleaning up the persistent agents."""
+
+import main
+from fakes import FakeAgentsClient
+
+
+def test_agent_is_reused_while_definition_is_unchanged(agent_ids_path):
+    client = FakeAgentsClient()
+    first = main.get_or_create_agent(client, "analysis", "gpt", "instructions")
+    second = main.get_or_create_agent(client, "analysis", "gpt", "instructions")
+
+    assert second.id == first.id
+    assert len(client.created) == 1
+
+
+def test_changed_definition_recreates_agent(agent_ids_path):
+    client = FakeAgentsClient()
+    first = main.get_or_create_agent(client, "analysis", "gpt", "instructions")
+    second = main.get_or_create_agent(client, "analysis", "gpt", "new instructions")
+
+    assert second.id != first.id
+    assert client.deleted == [first.id]
+    assert main.load_agent_ids()["analysis"]["id"] == second.id
+
+
+def test_agent_deleted_remotely_is_recreated(agent_ids_path):
+    client = FakeAgentsClient()
+    first = main.get_or_create_agent(client, "analysis", "gpt", "instructions")
+    client.missing.add(first.id)
+
+    second = main.get_or_create_agent(client, "analysis", "gpt", "instructions")
+    assert second.id != first.id
+
+
+def test_cleanup_keeps_ids_of_agents_that_failed_to_delete(agent_ids_path, monkeypatch):
+    main.save_agent_ids({"analysis": {"id": "a1", "hash": "h"}, "optimizer": {"id": "a2", "hash": "h"}})
+    client = FakeAgentsClient(failing_deletes={"a2"})
+    monkeypatch.setattr(main, "get_agents_client", lambda: (client, "gpt"))
+
+    main.cleanup_agents()
+    assert main.load_agent_ids() == {"optimizer": {"id": "a2", "hash": "h"}}
+
+    client.failing_deletes.clear()
+    main.cleanup_agents()
+    assert not agent_ids_path.exists()
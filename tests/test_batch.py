@@ -0,0 +1,61 @@
+"""Offline checks for batch mode: input parsing, cache hits and per-item failures."""
+
+import json
+import pathlib
+
+import pytest
+
+import main
+
+
+def test_load_batch_file_accepts_strings_and_objects(tmp_path):
+    path = tmp_path / "batch.jsonl"
+    path.write_text(
+        '"first process"\n'
+        '\n'
+        '{"process_description": "second process", "owner": "ops"}\n',
+        encoding="utf-8"
+    )
+
+    assert main.load_batch_file(str(path)) == ["first process", "second process"]
+
+
+@pytest.fixture
+def batch_env(tmp_path, monkeypatch):
+    """Run batches in tmp_path with no Azure access; returns the list of get_agents calls."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(main, "get_agents_client", lambda: (object(), "gpt"))
+    monkeypatch.setattr(main, "get_credential", lambda: None)
+    monkeypatch.setattr(main, "create_embedder", lambda credential: None)
+    get_agents_calls = []
+    monkeypatch.setattr(main, "get_agents", lambda client, model: get_agents_calls.append(model) or ("a", "o"))
+    return get_agents_calls
+
+
+def test_cached_items_are_saved_without_resolving_agents(batch_env, monkeypatch, capsys):
+    main.ReportCache("gpt").put("cached process", "none", {"full_report": "CACHED"}, pathlib.Path("r.json"))
+    monkeypatch.setattr(main, "analyse_process", lambda *args, **kwargs: pytest.fail("cache hit was re-analysed"))
+
+    main.run_process_advisor_batch(["cached process"])
+
+    assert batch_env == []
+    [json_path] = pathlib.Path("outputs").glob("process_report_*_001.json")
+    assert json.loads(json_path.read_text(encoding="utf-8"))["full_report"] == "CACHED"
+    assert json_path.with_suffix(".md").exists()
+    assert f"{json_path.resolve()} (from cache)" in capsys.readouterr().out
+
+
+def test_failing_item_does_not_abort_the_batch(batch_env, monkeypatch, capsys):
+    def analyse(agents_client, agents, process_description, custom_commands, stream=False):
+        if process_description == "bad process":
+            raise ConnectionError("throttled")
+        return f"REPORT {process_description}"
+    monkeypatch.setattr(main, "analyse_process", analyse)
+
+    main.run_process_advisor_batch(["bad process", "good process"])
+
+    assert batch_env == ["gpt"]
+    out = capsys.readouterr().out
+    assert "[1] ❌ throttled" in out
+    [json_path] = pathlib.Path("outputs").glob("process_report_*_002.json")
+    assert json.loads(json_path.read_text(encoding="utf-8"))["full_report"] == "REPORT good process"
@@ -0,0 +1,47 @@
+"""Offline checks for the exact-match layer of the report cache."""
+
+import os
+import time
+
+import main
+from fakes import FakeEmbedder
+
+
+def test_exact_hit_needs_no_embedding(cache_dir, saved_report):
+    embed = FakeEmbedder({"desc": [1.0, 0.0]})
+    cache = main.ReportCache("gpt", embed=embed, cache_dir=cache_dir)
+
+    assert cache.get("desc", "none") is None
+    cache.put("desc", "none", {"full_report": "R"}, saved_report("r", "R"))
+    calls = embed.calls
+
+    assert cache.get("desc", "none") == {"full_report": "R"}
+    assert embed.calls == calls
+
+
+def test_exact_entry_expires_after_ttl(tmp_path, cache_dir):
+    cache = main.ReportCache("gpt", cache_dir=cache_dir, ttl=60)
+    cache.put("desc", "none", {"full_report": "R"}, tmp_path / "r.json")
+
+    exact_path = cache_dir / f"{cache.exact_key('desc', 'none')}.json"
+    old = time.time() - 120
+    os.utime(exact_path, (old, old))
+
+    assert cache.get("desc", "none") is None
+
+
+def test_entries_are_scoped_to_model_and_commands(cache_dir, saved_report):
+    vectors = {"desc": [1.0, 0.0]}
+    cache = main.ReportCache("gpt", embed=FakeEmbedder(vectors), cache_dir=cache_dir)
+    cache.put("desc", "none", {"full_report": "R"}, saved_report("r", "R"))
+
+    other_model = main.ReportCache("other", embed=FakeEmbedder(vectors), cache_dir=cache_dir)
+    assert other_model.get("desc", "none") is None
+    assert cache.get("desc", "be brief") is None
+
+
+def test_changed_agent_definition_invalidates_cache(tmp_path, cache_dir, monkeypatch):
+    main.ReportCache("gpt", cache_dir=cache_dir).put("desc", "none", {"full_report": "R"}, tmp_path / "r.json")
+
+    monkeypatch.setattr(main, "ANALYSIS_INSTRUCTIONS", main.ANALYSIS_INSTRUCTIONS + " Be concise.")
+    assert main.ReportCache("gpt", cache_dir=cache_dir).get("desc", "none") is None
@@ -0,0 +1,52 @@
+"""Offline checks for reading a process description piped on stdin."""
+
+import builtins
+import io
+import json
+import pathlib
+
+import pytest
+
+import main
+
+
+@pytest.fixture
+def advisor_env(tmp_path, monkeypatch):
+    """Run the advisor in tmp_path with no console or Azure access; returns the analyse_process calls."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(main.os, "system", lambda command: 0)
+    monkeypatch.setattr(builtins, "input", lambda *args: pytest.fail("piped input must not prompt"))
+    monkeypatch.setattr(main, "load_settings", lambda: ("https://project", "gpt"))
+    monkeypatch.setattr(main, "preload_sdk", lambda: None)
+    monkeypatch.setattr(main, "get_agents_client", lambda: (object(), "gpt"))
+    monkeypatch.setattr(main, "get_credential", lambda: None)
+    monkeypatch.setattr(main, "create_embedder", lambda credential: None)
+    monkeypatch.setattr(main, "get_agents", lambda client, model: ("a", "o"))
+    calls = []
+
+    def analyse(agents_client, agents, process_description, custom_commands, stream=False):
+        calls.append((process_description, custom_commands, stream))
+        return "REPORT"
+    monkeypatch.setattr(main, "analyse_process", analyse)
+    return calls
+
+
+def test_piped_description_is_read_in_one_go(advisor_env, monkeypatch):
+    monkeypatch.setattr(main.sys, "stdin", io.StringIO("\n  Step one\nStep two\n\nStep three\n\n"))
+
+    main.run_process_advisor(custom_commands="be brief")
+
+    # Blank lines inside the description are kept; only surrounding whitespace is stripped
+    assert advisor_env == [("Step one\nStep two\n\nStep three", "be brief", True)]
+    [json_path] = pathlib.Path("outputs").glob("process_report_*.json")
+    assert json.loads(json_path.read_text(encoding="utf-8"))["custom_commands"] == "be brief"
+
+
+def test_empty_piped_input_exits_before_any_service_call(advisor_env, monkeypatch, capsys):
+    monkeypatch.setattr(main.sys, "stdin", io.StringIO("  \n"))
+    monkeypatch.setattr(main, "get_agents_client", lambda: pytest.fail("client created for empty input"))
+
+    main.run_process_advisor()
+
+    assert advisor_env == []
+    assert "No process description provided" in capsys.readouterr().out
@@ -0,0 +1,85 @@
+"""Offline checks for the semantic layer of the report cache and its on-disk files."""
+
+import json
+
+import main
+from fakes import FakeEmbedder
+
+
+def test_semantic_match_respects_threshold(cache_dir, saved_report):
+    embed = FakeEmbedder({
+        "original": [1.0, 0.0],
+        "paraphrase": [0.99, 0.1],  # cosine ~0.995
+        "different": [0.5, 0.87],  # cosine ~0.5
+    })
+    cache = main.ReportCache("gpt", embed=embed, cache_dir=cache_dir)
+    assert cache.get("original", "none") is None
+    cache.put("original", "none", {"full_report": "E"}, saved_report("r", "SEMANTIC"))
+
+    assert cache.get("paraphrase", "none") == {"full_report": "SEMANTIC"}
+    assert cache.get("different", "none") is None
+
+
+def test_pending_embeddings_are_released(cache_dir, saved_report):
+    embed = FakeEmbedder({"original": [1.0, 0.0], "paraphrase": [0.99, 0.1]})
+    cache = main.ReportCache("gpt", embed=embed, cache_dir=cache_dir)
+
+    assert cache.get("original", "none") is None
+    cache.put("original", "none", {"full_report": "E"}, saved_report("r", "R"))
+    assert cache.get("paraphrase", "none") is not None
+
+    assert cache._pending_embeddings == {}
+
+
+def test_embedding_failure_fails_open(tmp_path, cache_dir):
+    cache = main.ReportCache("gpt", embed=FakeEmbedder({}, fail=True), cache_dir=cache_dir)
+
+    assert cache.get("desc", "none") is None
+    cache.put("desc", "none", {"full_report": "R"}, tmp_path / "r.json")
+
+    # The exact entry is still written even though semantic indexing was skipped
+    assert cache.get("desc", "none") == {"full_report": "R"}
+    assert not cache.index_path.exists()
+
+
+def test_disabled_cache_stores_nothing(tmp_path, cache_dir):
+    cache = main.ReportCache("gpt", cache_dir=cache_dir, enabled=False)
+    cache.put("desc", "none", {"full_report": "R"}, tmp_path / "r.json")
+
+    assert cache.get("desc", "none") is None
+    assert not cache_dir.exists()
+
+
+def test_corrupt_cache_files_are_misses(cache_dir, saved_report):
+    cache = main.ReportCache("gpt", embed=FakeEmbedder({"desc": [1.0, 0.0]}), cache_dir=cache_dir)
+    cache_dir.mkdir()
+    cache.index_path.write_text("[{", encoding="utf-8")
+    (cache_dir / f"{cache.exact_key('desc', 'none')}.json").write_text("{", encoding="utf-8")
+
+    assert cache.get("desc", "none") is None
+
+    # The next put replaces both files with valid JSON
+    cache.put("desc", "none", {"full_report": "R"}, saved_report("r", "R"))
+    assert cache.get("desc", "none") == {"full_report": "R"}
+    assert len(json.loads(cache.index_path.read_text(encoding="utf-8"))) == 1
+
+
+def test_index_drops_entries_whose_report_is_gone(cache_dir, saved_report):
+    embed = FakeEmbedder({"first": [1.0, 0.0], "second": [0.0, 1.0]})
+    cache = main.ReportCache("gpt", embed=embed, cache_dir=cache_dir)
+    first_report = saved_report("first", "R1")
+    cache.put("first", "none", {"full_report": "R1"}, first_report)
+    first_report.unlink()
+
+    second_report = saved_report("second", "R2")
+    cache.put("second", "none", {"full_report": "R2"}, second_report)
+
+    index = json.loads(cache.index_path.read_text(encoding="utf-8"))
+    assert [e["report_path"] for e in index] == [str(second_report)]
+
+
+def test_no_temp_files_are_left_behind(tmp_path, cache_dir):
+    cache = main.ReportCache("gpt", embed=FakeEmbedder({"desc": [1.0, 0.0]}), cache_dir=cache_dir)
+    cache.put("desc", "none", {"full_report": "R"}, tmp_path / "r.json")
+
+    assert not list(cache_dir.glob("*.tmp"))
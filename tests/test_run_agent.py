@@ -0,0 +1,51 @@
+"""Offline checks for the bounded polling loop in run_agent."""
+
+import threading
+
+import pytest
+
+import main
+from fakes import FakeRunClient
+
+
+@pytest.fixture(autouse=True)
+def fast_polling(monkeypatch):
+    monkeypatch.setattr(main, "POLL_INTERVAL_SECONDS", 0.001)
+
+
+def test_polls_until_completed_and_returns_the_reply():
+    client = FakeRunClient(statuses=["queued", "in_progress", "completed"], reply="final answer")
+
+    text, run = main.run_agent(client, "agent-1", "desc", max_completion_tokens=42)
+
+    assert text == "final answer"
+    assert run.status == "completed"
+    assert client.run_kwargs["max_completion_tokens"] == 42
+    assert client.run_kwargs["temperature"] == main.RUN_TEMPERATURE
+
+
+def test_stuck_run_is_cancelled_after_timeout(monkeypatch):
+    monkeypatch.setattr(main, "RUN_TIMEOUT_SECONDS", 0.05)
+    client = FakeRunClient(statuses=["in_progress"])
+
+    with pytest.raises(RuntimeError, match="timed out"):
+        main.run_agent(client, "agent-1", "desc")
+    assert client.cancelled == ["run-1"]
+
+
+@pytest.mark.parametrize("status", ["failed", "cancelled", "expired", "incomplete"])
+def test_unsuccessful_run_raises(status):
+    client = FakeRunClient(statuses=["in_progress", status])
+
+    with pytest.raises(RuntimeError, match=f"Run {status}"):
+        main.run_agent(client, "agent-1", "desc")
+
+
+def test_cancel_event_cancels_the_run():
+    client = FakeRunClient(statuses=["in_progress"])
+    cancel_event = threading.Event()
+    cancel_event.set()
+
+    with pytest.raises(RuntimeError, match="cancelled"):
+        main.run_agent(client, "agent-1", "desc", cancel_event=cancel_event)
+    assert client.cancelled == ["run-1"]
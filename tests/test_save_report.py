@@ -0,0 +1,76 @@
+"""Offline checks for the Markdown and JSON report files written by save_report."""
+
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+import main
+
+
+class TickingDatetime(datetime):
+    """datetime whose now() advances one second per call, so repeated calls would disagree."""
+    current = datetime(2025, 1, 31, 23, 59, 59)
+
+    @classmethod
+    def now(cls, tz=None):
+        value = cls.current
+        cls.current += timedelta(seconds=1)
+        return value
+
+
+REPORT = {
+    "timestamp": "2025-01-31T23:59:59",
+    "process_description": "Invoices are approved by the CFO — then filed",
+    "custom_commands": "none",
+    "full_report": "## PROCESS ANALYSIS\n\n1. Réception\n\t2. 受付",
+}
+
+
+@pytest.fixture
+def outputs(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(TickingDatetime, "current", TickingDatetime.current)
+    monkeypatch.setattr(main, "datetime", TickingDatetime)
+    return tmp_path / "outputs"
+
+
+def test_file_name_date_line_and_json_share_one_timestamp(outputs):
+    result, md_path, json_path = main.save_report("desc", "none", "REPORT", suffix="_001")
+
+    assert md_path.name == "process_report_20250131-235959_001.md"
+    assert json_path.name == "process_report_20250131-235959_001.json"
+    assert "**Date:** 2025-01-31 23:59:59\n" in md_path.read_text(encoding="utf-8")
+    assert result["timestamp"] == "2025-01-31T23:59:59"
+    assert json.loads(json_path.read_text(encoding="utf-8"))["timestamp"] == "2025-01-31T23:59:59"
+
+
+@pytest.mark.parametrize("custom_commands, instructions_line", [
+    ("none", ""),
+    ("Focus on approvals", "**Additional Instructions:** Focus on approvals\n\n"),
+])
+def test_markdown_layout(outputs, custom_commands, instructions_line):
+    _, md_path, _ = main.save_report("Step one\nStep two", custom_commands, "## PROCESS ANALYSIS\n\nRÉSUMÉ")
+
+    assert md_path.read_bytes() == (
+        "# Business Process Automation Report\n\n"
+        "**Date:** 2025-01-31 23:59:59\n\n"
+        "## Original Process Description\n"
+        "```\nStep one\nStep two\n```\n\n"
+        + instructions_line +
+        "## Full Report\n\n"
+        "## PROCESS ANALYSIS\n\nRÉSUMÉ"
+    ).encode("utf-8")
+
+
+@pytest.fixture(params=["orjson", "json"])
+def json_backend(request, monkeypatch):
+    if request.param == "orjson":
+        pytest.importorskip("orjson")
+    else:
+        monkeypatch.setattr(main, "orjson", None)
+    return request.param
+
+
+def test_dump_report_json_matches_stdlib_output(json_backend):
+    assert main.dump_report_json(REPORT) == json.dumps(REPORT, ensure_ascii=False, indent=2).encode("utf-8")
@@ -0,0 +1,65 @@
+"""Offline checks for handling the event stream in stream_agent."""
+
+import pytest
+from azure.ai.agents.models import AgentStreamEvent, MessageDeltaChunk, ThreadRun
+from azure.core.exceptions import ServiceResponseError
+
+import main
+from fakes import FakeRunClient
+
+
+def run_event(status, **fields):
+    return AgentStreamEvent(f"thread.run.{status}"), ThreadRun({"id": "run-1", "status": status, **fields})
+
+
+def delta_event(text):
+    return AgentStreamEvent.THREAD_MESSAGE_DELTA, MessageDeltaChunk({
+        "id": "msg-1", "object": "thread.message.delta",
+        "delta": {"role": "assistant", "content": [{"index": 0, "type": "text", "text": {"value": text}}]}
+    })
+
+
+def test_deltas_are_printed_and_joined(capsys):
+    client = FakeRunClient(events=[
+        run_event("in_progress"), delta_event("Hello, "), delta_event("world"), run_event("completed"),
+    ])
+
+    text, run = main.stream_agent(client, "agent-1", "desc")
+
+    assert text == "Hello, world"
+    assert run.status == "completed"
+    assert capsys.readouterr().out == "Hello, world\n"
+    assert client.run_kwargs["read_timeout"] == main.STREAM_READ_TIMEOUT_SECONDS
+
+
+@pytest.mark.parametrize("status", ["failed", "incomplete"])
+def test_unsuccessful_run_raises(status):
+    client = FakeRunClient(events=[run_event("in_progress"), delta_event("partial"), run_event(status)])
+
+    with pytest.raises(RuntimeError, match=f"Run {status}"):
+        main.stream_agent(client, "agent-1", "desc")
+
+
+def test_error_event_raises():
+    client = FakeRunClient(events=[(AgentStreamEvent.ERROR, "server_error")])
+
+    with pytest.raises(RuntimeError, match="server_error"):
+        main.stream_agent(client, "agent-1", "desc")
+
+
+def test_stream_without_terminal_event_raises_and_cancels():
+    client = FakeRunClient(events=[run_event("in_progress"), delta_event("partial")])
+
+    with pytest.raises(RuntimeError, match="ended before the run finished"):
+        main.stream_agent(client, "agent-1", "desc")
+    assert client.cancelled == ["run-1"]
+
+
+def test_stalled_stream_raises_and_cancels():
+    client = FakeRunClient(events=[
+        run_event("in_progress"), delta_event("partial"), ServiceResponseError("read timed out"),
+    ])
+
+    with pytest.raises(RuntimeError, match="interrupted"):
+        main.stream_agent(client, "agent-1", "desc")
+    assert client.cancelled == ["run-1"]